@@ -140,6 +140,15 @@ class EventSource(metaclass=ABCMeta):
         :param event: the event to publish
         """
 
+    async def publish_many(self, events: Iterable[Event]) -> None:
+        """
+        Publish several events, in order.
+
+        :param events: the events to publish
+        """
+        for event in events:
+            await self.publish(event)
+
 
 class DataStore(EventSource):
     async def __aenter__(self):
@@ -205,6 +214,18 @@ class DataStore(EventSource):
         :param job: the job object
         """
 
+    async def add_jobs(self, jobs: List[Job]) -> None:
+        """
+        Add several jobs at once to be executed by eligible workers.
+
+        The default implementation calls :meth:`add_job` for each job in turn. Data stores that can
+        insert multiple jobs more efficiently should override this.
+
+        :param jobs: the job objects
+        """
+        for job in jobs:
+            await self.add_job(job)
+
     @abstractmethod
     async def get_jobs(self, ids: Optional[Iterable[UUID]] = None) -> List[Job]:
         """
@@ -166,6 +166,7 @@ class MongoDBDataStore(DataStore, EventHub):
 
             async with move_on_after(self.max_poll_time):
                 await self._schedules_event.wait()
+                self._schedules_event.clear()
 
     async def release_schedules(self, scheduler_id: str, schedules: List[Schedule]) -> None:
         updated_schedules: List[Tuple[str, datetime]] = []
@@ -1,14 +1,14 @@
 import asyncio
 import logging
-from asyncio import current_task
-from datetime import datetime, timezone
-from typing import Iterable, List, Optional, Set
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Set, TypeVar
 from uuid import UUID
 
 import sniffio
-from anyio import create_task_group, move_on_after, sleep
+from anyio import (
+    create_task_group, move_on_after, open_cancel_scope, run_sync_in_worker_thread, sleep)
 from anyio.abc import TaskGroup
-from asyncpg import UniqueViolationError
+from asyncpg import Connection, Record, UniqueViolationError
 from asyncpg.pool import Pool
 
 from ..abc import DataStore, Job, Schedule, Serializer
@@ -18,47 +18,74 @@ from ..exceptions import ConflictingIdError, SerializationError
 from ..policies import ConflictPolicy
 from ..serializers.pickle import PickleSerializer
 
+T = TypeVar('T')
+
 logger = logging.getLogger(__name__)
 
 
+def _as_sequence(values: Iterable[T]) -> Sequence[T]:
+    return values if isinstance(values, (list, tuple)) else tuple(values)
+
+
+def _deserialize_all(deserialize: Callable[[bytes], Any], records: List[Record]) -> List[Any]:
+    return [deserialize(r[0]) for r in records]
+
+
 class PostgresqlDataStore(DataStore, EventHub):
     _task_group: TaskGroup
     _schedules_event: Optional[asyncio.Event] = None
     _jobs_event: Optional[asyncio.Event] = None
+    _notify_event: Optional[asyncio.Event] = None
 
     def __init__(self, pool: Pool, *, schema: str = 'public',
-                 notify_channel: Optional[str] = 'apscheduler',
+                 notify_channel: Optional[str] = 'apscheduler', notify_delay: float = 0.01,
                  serializer: Optional[Serializer] = None,
                  lock_expiration_delay: float = 30, max_poll_time: Optional[float] = 1,
-                 max_idle_time: float = 60, start_from_scratch: bool = False):
+                 max_idle_time: float = 60, partitions: int = 0,
+                 threaded_deserialization_threshold: int = 32,
+                 start_from_scratch: bool = False):
         super().__init__()
+        if max_idle_time < 1:
+            raise ValueError('max_idle_time must be at least 1 second')
+        if partitions < 0:
+            raise ValueError('partitions must not be negative')
+
         self.pool = pool
         self.schema = schema
         self.notify_channel = notify_channel
+        self.notify_delay = notify_delay
         self.serializer = serializer or PickleSerializer()
         self.lock_expiration_delay = lock_expiration_delay
         self.max_poll_time = max_poll_time
         self.max_idle_time = max_idle_time
+        self.partitions = partitions
+        self.threaded_deserialization_threshold = threaded_deserialization_threshold
         self.start_from_scratch = start_from_scratch
         self._logger = logging.getLogger(__name__)
+        self._lock_expiration_delta = timedelta(seconds=lock_expiration_delay)
         self._loans = 0
+        self._pending_notifications: Set[str] = set()
+        self._build_queries()
 
     async def __aenter__(self):
-        asynclib = sniffio.current_async_library() or '(unknown)'
-        if asynclib != 'asyncio':
-            raise RuntimeError(f'This data store requires asyncio; currently running: {asynclib}')
-
         if self._loans == 0:
+            # Nested entries happen inside the outermost one, so checking once is enough
+            asynclib = sniffio.current_async_library() or '(unknown)'
+            if asynclib != 'asyncio':
+                raise RuntimeError(f'This data store requires asyncio; currently running: '
+                                   f'{asynclib}')
+
             self._schedules_event = asyncio.Event()
             self._jobs_event = asyncio.Event()
+            self._notify_event = asyncio.Event()
             await self._setup()
 
         self._loans += 1
         if self._loans == 1 and self.notify_channel:
-            print('entering postgresql data store in task', id(current_task()))
             self._task_group = create_task_group()
             await self._task_group.__aenter__()
             await self._task_group.spawn(self._listen_notifications)
+            await self._task_group.spawn(self._send_notifications)
 
         return self
 
@@ -66,11 +93,14 @@ class PostgresqlDataStore(DataStore, EventHub):
         assert self._loans
         self._loans -= 1
         if self._loans == 0 and self.notify_channel:
-            print('exiting postgresql data store in task', id(current_task()))
-            await self._task_group.cancel_scope.cancel()
-            await self._task_group.__aexit__(exc_type, exc_val, exc_tb)
-            del self._schedules_event
-            del self._jobs_event
+            try:
+                await self._flush_notifications()
+            finally:
+                await self._task_group.cancel_scope.cancel()
+                await self._task_group.__aexit__(exc_type, exc_val, exc_tb)
+                del self._schedules_event
+                del self._jobs_event
+                del self._notify_event
 
     async def _listen_notifications(self) -> None:
         def callback(connection, pid, channel: str, payload: str) -> None:
@@ -81,15 +111,135 @@ class PostgresqlDataStore(DataStore, EventHub):
                 self._jobs_event.set()
 
         while True:
+            terminated = asyncio.Event()
+
+            def on_termination(connection) -> None:
+                terminated.set()
+
             async with self.pool.acquire() as conn:
+                # Have the server send TCP keepalives on this otherwise idle connection, rather
+                # than waking up periodically to run a dummy query on it. This only lets the
+                # server drop dead clients: asyncpg does not enable keepalives on its own socket,
+                # so a half-open connection (dead server host, network partition) goes unnoticed
+                # here. Until the connection is closed, the acquire methods still fall back to
+                # polling every max_poll_time seconds.
+                await conn.execute(f"SET tcp_keepalives_idle = {int(self.max_idle_time)}")
                 await conn.add_listener(self.notify_channel, callback)
+                conn.add_termination_listener(on_termination)
                 try:
-                    while True:
-                        await sleep(self.max_idle_time)
-                        await conn.execute('SELECT 1')
+                    await terminated.wait()
                 finally:
+                    conn.remove_termination_listener(on_termination)
                     await conn.remove_listener(self.notify_channel, callback)
 
+            # Notifications may have been missed while the connection was down, so wake up any
+            # waiters before listening again on a fresh connection
+            self._logger.warning('Lost the notification connection; reconnecting')
+            self._schedules_event.set()
+            self._jobs_event.set()
+
+    def _build_queries(self) -> None:
+        self._sql_add_schedule = (
+            f"INSERT INTO {self.schema}.schedules (id, serialized_data, task_id, next_fire_time) "
+            f"VALUES ($1, $2, $3, $4)")
+        self._sql_add_schedule_if_absent = (
+            f"INSERT INTO {self.schema}.schedules (id, serialized_data, task_id, next_fire_time) "
+            f"VALUES ($1, $2, $3, $4) ON CONFLICT (id) DO NOTHING RETURNING id")
+        self._sql_upsert_schedule = (
+            f"INSERT INTO {self.schema}.schedules (id, serialized_data, task_id, next_fire_time) "
+            f"VALUES ($1, $2, $3, $4) ON CONFLICT (id) DO UPDATE "
+            f"SET serialized_data = excluded.serialized_data, task_id = excluded.task_id, "
+            f"next_fire_time = excluded.next_fire_time "
+            f"RETURNING (xmax = 0) AS inserted")
+        self._sql_remove_schedules = (
+            f"DELETE FROM {self.schema}.schedules "
+            f"WHERE id = any($1::text[]) AND (acquired_until IS NULL OR acquired_until < $2) "
+            f"RETURNING id")
+        self._sql_get_schedules = (
+            f"SELECT serialized_data FROM {self.schema}.schedules ORDER BY id")
+        self._sql_get_schedules_by_id = (
+            f"SELECT serialized_data FROM {self.schema}.schedules WHERE id = any($1::text[]) "
+            f"ORDER BY id")
+        self._sql_acquire_schedules = f"""
+            WITH schedule_ids AS (
+                SELECT id FROM {self.schema}.schedules
+                WHERE next_fire_time IS NOT NULL AND next_fire_time <= $1
+                    AND (acquired_until IS NULL OR $1 > acquired_until)
+                ORDER BY next_fire_time
+                FOR NO KEY UPDATE SKIP LOCKED
+                FETCH FIRST $2 ROWS ONLY
+            )
+            UPDATE {self.schema}.schedules SET acquired_by = $3, acquired_until = $4
+            WHERE id IN (SELECT id FROM schedule_ids)
+            RETURNING serialized_data
+        """
+        self._sql_release_schedules = f"""
+            WITH updated AS (
+                UPDATE {self.schema}.schedules AS s
+                SET serialized_data = u.serialized_data, next_fire_time = u.next_fire_time,
+                    acquired_by = NULL, acquired_until = NULL
+                FROM unnest($1::text[], $2::bytea[], $3::timestamptz[])
+                    AS u (id, serialized_data, next_fire_time)
+                WHERE s.id = u.id AND s.acquired_by = $5
+            )
+            DELETE FROM {self.schema}.schedules WHERE id = any($4::text[]) AND acquired_by = $5
+        """
+        self._sql_add_job = (
+            f"INSERT INTO {self.schema}.jobs (id, task_id, created_at, serialized_data, tags) "
+            f"VALUES ($1, $2, $3, $4, $5)")
+        self._sql_get_jobs = f"SELECT serialized_data FROM {self.schema}.jobs ORDER BY id"
+        self._sql_get_jobs_by_id = (
+            f"SELECT serialized_data FROM {self.schema}.jobs WHERE id = any($1::uuid[]) "
+            f"ORDER BY id")
+        self._sql_acquire_jobs = f"""
+            WITH job_ids AS (
+                SELECT id FROM {self.schema}.jobs
+                WHERE acquired_until IS NULL OR acquired_until < $1
+                ORDER BY created_at
+                FOR NO KEY UPDATE SKIP LOCKED
+                FETCH FIRST $2 ROWS ONLY
+            )
+            UPDATE {self.schema}.jobs SET acquired_by = $3, acquired_until = $4
+            WHERE id IN (SELECT id FROM job_ids)
+            RETURNING serialized_data
+        """
+        self._sql_release_jobs = (
+            f"DELETE FROM {self.schema}.jobs WHERE acquired_by = $1 AND id = any($2::uuid[])")
+
+    async def _notify(self, payload: str) -> None:
+        if not self.notify_channel:
+            return
+
+        if self._notify_event is None:
+            # Without the background task (the store has not been entered), notify right away
+            await self.pool.execute(f"NOTIFY {self.notify_channel}, '{payload}'")
+        else:
+            self._pending_notifications.add(payload)
+            self._notify_event.set()
+
+    async def _send_notifications(self) -> None:
+        # Wait a little after the first write so that a burst of writes is coalesced into a single
+        # notification per payload
+        while True:
+            await self._notify_event.wait()
+            await sleep(self.notify_delay)
+            self._notify_event.clear()
+            try:
+                await self._flush_notifications()
+            except Exception:
+                # The payloads were put back, so they go out along with the next write
+                self._logger.exception('Error sending notifications')
+
+    async def _flush_notifications(self) -> None:
+        payloads, self._pending_notifications = self._pending_notifications, set()
+        if payloads:
+            try:
+                await self.pool.execute('; '.join(f"NOTIFY {self.notify_channel}, '{payload}'"
+                                                  for payload in sorted(payloads)))
+            except BaseException:
+                self._pending_notifications |= payloads
+                raise
+
     async def _setup(self) -> None:
         async with self.pool.acquire() as conn, conn.transaction():
             if self.start_from_scratch:
@@ -104,7 +254,14 @@ class PostgresqlDataStore(DataStore, EventHub):
             """)
             version = await conn.fetchval(f"SELECT schema_version FROM {self.schema}.metadata")
             if version is None:
-                await conn.execute(f"INSERT INTO {self.schema}.metadata VALUES (1)")
+                # Hash partitioned tables spread the row locks of competing schedulers and workers
+                # over several smaller tables and indexes
+                if self.partitions:
+                    table_options = 'PARTITION BY HASH (id)'
+                else:
+                    table_options = 'WITH (fillfactor = 80)'
+
+                await conn.execute(f"INSERT INTO {self.schema}.metadata VALUES (2)")
                 await conn.execute(f"""
                     CREATE TABLE {self.schema}.schedules (
                         id TEXT PRIMARY KEY,
@@ -113,9 +270,8 @@ class PostgresqlDataStore(DataStore, EventHub):
                         next_fire_time TIMESTAMP WITH TIME ZONE,
                         acquired_by TEXT,
                         acquired_until TIMESTAMP WITH TIME ZONE
-                    ) WITH (fillfactor = 80)
+                    ) {table_options}
                 """)
-                await conn.execute(f"CREATE INDEX ON {self.schema}.schedules (next_fire_time)")
                 await conn.execute(f"""
                     CREATE TABLE {self.schema}.jobs (
                         id UUID PRIMARY KEY,
@@ -125,13 +281,40 @@ class PostgresqlDataStore(DataStore, EventHub):
                         created_at TIMESTAMP WITH TIME ZONE NOT NULL,
                         acquired_by TEXT,
                         acquired_until TIMESTAMP WITH TIME ZONE
-                    ) WITH (fillfactor = 80)
+                    ) {table_options}
                 """)
                 await conn.execute(f"CREATE INDEX ON {self.schema}.jobs (task_id)")
                 await conn.execute(f"CREATE INDEX ON {self.schema}.jobs (tags)")
-            elif version > 1:
+                await self._create_acquire_indexes(conn)
+                for table in ('schedules', 'jobs'):
+                    for remainder in range(self.partitions):
+                        await conn.execute(
+                            f"CREATE TABLE {self.schema}.{table}_p{remainder} "
+                            f"PARTITION OF {self.schema}.{table} FOR VALUES WITH "
+                            f"(MODULUS {self.partitions}, REMAINDER {remainder}) "
+                            f"WITH (fillfactor = 80)")
+            elif version == 1:
+                # Lock the version row so that only one of several concurrently starting stores
+                # performs the migration
+                version = await conn.fetchval(
+                    f"SELECT schema_version FROM {self.schema}.metadata FOR UPDATE")
+                if version == 1:
+                    await conn.execute(
+                        f"DROP INDEX IF EXISTS {self.schema}.schedules_next_fire_time_idx")
+                    await self._create_acquire_indexes(conn)
+                    await conn.execute(f"UPDATE {self.schema}.metadata SET schema_version = 2")
+            elif version > 2:
                 raise RuntimeError(f'Unexpected schema version ({version}); '
-                                   f'only version 1 is supported by this version of APScheduler')
+                                   f'only versions 1 and 2 are supported by this version of '
+                                   f'APScheduler')
+
+    async def _create_acquire_indexes(self, conn: Connection) -> None:
+        await conn.execute(
+            f"CREATE INDEX schedules_next_fire_time_acquired_until_idx "
+            f"ON {self.schema}.schedules (next_fire_time, acquired_until)")
+        await conn.execute(
+            f"CREATE INDEX jobs_acquired_until_created_at_idx "
+            f"ON {self.schema}.jobs (acquired_until, created_at)")
 
     async def clear(self) -> None:
         async with self.pool.acquire() as conn, conn.transaction():
@@ -139,192 +322,160 @@ class PostgresqlDataStore(DataStore, EventHub):
             await conn.execute(f"TRUNCATE TABLE {self.schema}.jobs")
 
     async def add_schedule(self, schedule: Schedule, conflict_policy: ConflictPolicy) -> None:
-        event: Optional[ScheduleEvent] = None
+        inserted = True
         serialized_data = self.serializer.serialize(schedule)
-        query = (f"INSERT INTO {self.schema}.schedules (id, serialized_data, task_id, "
-                 f"next_fire_time) VALUES ($1, $2, $3, $4)")
-        async with self.pool.acquire() as conn:
+        args = (schedule.id, serialized_data, schedule.task_id, schedule.next_fire_time)
+        if conflict_policy is ConflictPolicy.replace:
+            # A row version with no deleting transaction (xmax = 0) means a fresh insert
+            inserted = await self.pool.fetchval(self._sql_upsert_schedule, *args)
+        elif conflict_policy is ConflictPolicy.do_nothing:
+            if await self.pool.fetchval(self._sql_add_schedule_if_absent, *args) is None:
+                return
+        else:
             try:
-                async with conn.transaction():
-                    await conn.execute(query, schedule.id, serialized_data, schedule.task_id,
-                                       schedule.next_fire_time)
+                await self.pool.execute(self._sql_add_schedule, *args)
             except UniqueViolationError:
-                if conflict_policy is ConflictPolicy.exception:
-                    raise ConflictingIdError(schedule.id) from None
-                elif conflict_policy is ConflictPolicy.replace:
-                    query = (f"UPDATE {self.schema}.schedules SET serialized_data = $2, "
-                             f"task_id = $3, next_fire_time = $4 WHERE id = $1")
-                    async with conn.transaction():
-                        await conn.execute(query, schedule.id, serialized_data, schedule.task_id,
-                                           schedule.next_fire_time)
-                    event = ScheduleUpdated(datetime.now(timezone.utc), schedule.id,
-                                            schedule.next_fire_time)
-            else:
-                event = ScheduleAdded(datetime.now(timezone.utc), schedule.id,
-                                      schedule.next_fire_time)
-
-        if event:
-            await self.publish(event)
+                raise ConflictingIdError(schedule.id) from None
 
-        if self.notify_channel:
-            await self.pool.execute(f"NOTIFY {self.notify_channel}, 'schedule'")
+        await self._notify('schedule')
+        now = datetime.now(timezone.utc)
+        if inserted:
+            await self.publish(ScheduleAdded(now, schedule.id, schedule.next_fire_time))
+        else:
+            await self.publish(ScheduleUpdated(now, schedule.id, schedule.next_fire_time))
 
     async def remove_schedules(self, ids: Iterable[str]) -> None:
         async with self.pool.acquire() as conn, conn.transaction():
             now = datetime.now(timezone.utc)
-            query = (f"DELETE FROM {self.schema}.schedules "
-                     f"WHERE id = any($1::text[]) "
-                     f"  AND (acquired_until IS NULL OR acquired_until < $2) "
-                     f"RETURNING id")
-            removed_ids = [row[0] for row in await conn.fetch(query, list(ids), now)]
+            records = await conn.fetch(self._sql_remove_schedules, _as_sequence(ids), now)
+            removed_ids = [row[0] for row in records]
 
-        for schedule_id in removed_ids:
-            await self.publish(ScheduleRemoved(now, schedule_id))
+        await self.publish_many([ScheduleRemoved(now, schedule_id) for schedule_id in removed_ids])
 
     async def get_schedules(self, ids: Optional[Set[str]] = None) -> List[Schedule]:
-        query = f"SELECT serialized_data FROM {self.schema}.schedules"
+        query = self._sql_get_schedules
         args = ()
         if ids:
-            query += " WHERE id = any($1::text[])"
-            args = (ids,)
+            query = self._sql_get_schedules_by_id
+            args = (_as_sequence(ids),)
 
-        query += " ORDER BY id"
         records = await self.pool.fetch(query, *args)
-        return [self.serializer.deserialize(r[0]) for r in records]
+
+        deserialize = self.serializer.deserialize
+        return [deserialize(r[0]) for r in records]
 
     async def acquire_schedules(self, scheduler_id: str, limit: int) -> List[Schedule]:
+        deserialize = self.serializer.deserialize
         while True:
-            schedules: List[Schedule] = []
-            async with self.pool.acquire() as conn, conn.transaction():
-                acquired_until = datetime.fromtimestamp(
-                    datetime.now(timezone.utc).timestamp() + self.lock_expiration_delay,
-                    timezone.utc)
-                records = await conn.fetch(f"""
-                    WITH schedule_ids AS (
-                        SELECT id FROM {self.schema}.schedules
-                        WHERE next_fire_time IS NOT NULL AND next_fire_time <= $1
-                            AND (acquired_until IS NULL OR $1 > acquired_until)
-                        ORDER BY next_fire_time
-                        FOR NO KEY UPDATE SKIP LOCKED
-                        FETCH FIRST $2 ROWS ONLY
-                    )
-                    UPDATE {self.schema}.schedules SET acquired_by = $3, acquired_until = $4
-                    WHERE id IN (SELECT id FROM schedule_ids)
-                    RETURNING serialized_data
-                    """, datetime.now(timezone.utc), limit, scheduler_id, acquired_until)
-
-            for record in records:
-                schedule = self.serializer.deserialize(record['serialized_data'])
-                schedules.append(schedule)
-
-            if schedules:
-                return schedules
+            # The acquiring UPDATE is a single statement, so it needs no explicit transaction
+            async with self.pool.acquire() as conn:
+                now = datetime.now(timezone.utc)
+                acquired_until = now + self._lock_expiration_delta
+                records = await conn.fetch(self._sql_acquire_schedules, now, limit, scheduler_id,
+                                           acquired_until)
+
+            if records:
+                return [deserialize(r[0]) for r in records]
 
             async with move_on_after(self.max_poll_time):
                 await self._schedules_event.wait()
+                self._schedules_event.clear()
 
     async def release_schedules(self, scheduler_id: str, schedules: List[Schedule]) -> None:
-        update_events: List[ScheduleUpdated] = []
+        update_events: List[ScheduleEvent] = []
+        update_ids: List[str] = []
+        update_data: List[bytes] = []
+        update_fire_times: List[datetime] = []
         finished_schedule_ids: List[str] = []
-        async with self.pool.acquire() as conn, conn.transaction():
-            update_args = []
-            now = datetime.now(timezone.utc)
-            for schedule in schedules:
-                if schedule.next_fire_time is not None:
-                    try:
-                        serialized_data = self.serializer.serialize(schedule)
-                    except SerializationError:
-                        self._logger.exception('Error serializing schedule %r – '
-                                               'removing from data store', schedule.id)
-                        finished_schedule_ids.append(schedule.id)
-                        continue
-
-                    update_args.append((serialized_data, schedule.next_fire_time, schedule.id))
-                    update_events.append(
-                        ScheduleUpdated(now, schedule.id, schedule.next_fire_time))
-                else:
+        now = datetime.now(timezone.utc)
+        for schedule in schedules:
+            if schedule.next_fire_time is not None:
+                try:
+                    serialized_data = self.serializer.serialize(schedule)
+                except SerializationError:
+                    self._logger.exception('Error serializing schedule %r – '
+                                           'removing from data store', schedule.id)
                     finished_schedule_ids.append(schedule.id)
+                    continue
 
-            # Update schedules that have a next fire time
-            if update_args:
-                await conn.executemany(
-                    f"UPDATE {self.schema}.schedules SET serialized_data = $1, "
-                    f"next_fire_time = $2, acquired_by = NULL, acquired_until = NULL "
-                    f"WHERE id = $3 AND acquired_by = {scheduler_id!r}", update_args)
-
-            # Remove schedules that have no next fire time or failed to serialize
-            if finished_schedule_ids:
-                await conn.execute(
-                    f"DELETE FROM {self.schema}.schedules "
-                    f"WHERE id = any($1::text[]) AND acquired_by = $2",
-                    list(finished_schedule_ids), scheduler_id)
+                update_ids.append(schedule.id)
+                update_data.append(serialized_data)
+                update_fire_times.append(schedule.next_fire_time)
+                update_events.append(ScheduleUpdated(now, schedule.id, schedule.next_fire_time))
+            else:
+                finished_schedule_ids.append(schedule.id)
 
-        for event in update_events:
-            await self.publish(event)
+        # Update schedules that have a next fire time and remove the ones that have no next fire
+        # time or failed to serialize, all in a single statement
+        if update_ids or finished_schedule_ids:
+            await self.pool.execute(self._sql_release_schedules, update_ids, update_data,
+                                    update_fire_times, finished_schedule_ids, scheduler_id)
 
-        if update_events and self.notify_channel:
-            await self.pool.execute(f"NOTIFY {self.notify_channel}, 'schedule'")
+        if update_events:
+            await self._notify('schedule')
 
-        for schedule_id in finished_schedule_ids:
-            event = ScheduleRemoved(datetime.now(timezone.utc), schedule_id)
-            await self.publish(event)
+        await self.publish_many(update_events + [ScheduleRemoved(now, schedule_id)
+                                                 for schedule_id in finished_schedule_ids])
 
     async def add_job(self, job: Job) -> None:
         now = datetime.now(timezone.utc)
-        query = (f"INSERT INTO {self.schema}.jobs (id, task_id, created_at, serialized_data, "
-                 f"tags) VALUES($1, $2, $3, $4, $5)")
-        await self.pool.execute(query, job.id, job.task_id, now, self.serializer.serialize(job),
-                                job.tags)
+        serialized_data = self.serializer.serialize(job)
+        async with self.pool.acquire() as conn:
+            await conn.execute(self._sql_add_job, job.id, job.task_id, now, serialized_data,
+                               job.tags)
+
+        await self._notify('job')
         await self.publish(JobAdded(now, job.id, job.task_id, job.schedule_id))
 
-        if self.notify_channel:
-            await self.pool.execute(f"NOTIFY {self.notify_channel}, 'job'")
+    async def add_jobs(self, jobs: List[Job]) -> None:
+        if not jobs:
+            return
+
+        now = datetime.now(timezone.utc)
+        serialize = self.serializer.serialize
+        records = [(job.id, job.task_id, now, serialize(job), job.tags) for job in jobs]
+        async with self.pool.acquire() as conn:
+            await conn.copy_records_to_table(
+                'jobs', records=records, schema_name=self.schema,
+                columns=['id', 'task_id', 'created_at', 'serialized_data', 'tags'])
+
+        await self._notify('job')
+        await self.publish_many([JobAdded(now, job.id, job.task_id, job.schedule_id)
+                                 for job in jobs])
 
     async def get_jobs(self, ids: Optional[Iterable[UUID]] = None) -> List[Job]:
-        query = f"SELECT serialized_data FROM {self.schema}.jobs"
+        query = self._sql_get_jobs
         args = ()
         if ids:
-            query += " WHERE id = any($1::uuid[])"
-            args = (ids,)
+            query = self._sql_get_jobs_by_id
+            args = (_as_sequence(ids),)
 
-        query += " ORDER BY id"
         records = await self.pool.fetch(query, *args)
-        return [self.serializer.deserialize(r[0]) for r in records]
+
+        deserialize = self.serializer.deserialize
+        return [deserialize(r[0]) for r in records]
 
     async def acquire_jobs(self, worker_id: str, limit: Optional[int] = None) -> List[Job]:
+        deserialize = self.serializer.deserialize
         while True:
-            print('acquiring jobs')
-            jobs: List[Job] = []
-            async with self.pool.acquire() as conn, conn.transaction():
+            async with self.pool.acquire() as conn:
                 now = datetime.now(timezone.utc)
-                acquired_until = datetime.fromtimestamp(
-                    now.timestamp() + self.lock_expiration_delay, timezone.utc)
-                records = await conn.fetch(f"""
-                    WITH job_ids AS (
-                        SELECT id FROM {self.schema}.jobs
-                        WHERE acquired_until IS NULL OR acquired_until < $1
-                        ORDER BY created_at
-                        FOR NO KEY UPDATE SKIP LOCKED
-                        FETCH FIRST $2 ROWS ONLY
-                    )
-                    UPDATE {self.schema}.jobs SET acquired_by = $3, acquired_until = $4
-                    WHERE id IN (SELECT id FROM job_ids)
-                    RETURNING serialized_data
-                    """, now, limit, worker_id, acquired_until)
-
-            for record in records:
-                job = self.serializer.deserialize(record['serialized_data'])
-                jobs.append(job)
-
-            if jobs:
-                return jobs
+                acquired_until = now + self._lock_expiration_delta
+                records = await conn.fetch(self._sql_acquire_jobs, now, limit, worker_id,
+                                           acquired_until)
+
+            if len(records) > self.threaded_deserialization_threshold:
+                # Keep the event loop responsive while deserializing a large batch of jobs. The
+                # jobs have already been claimed, so don't let cancellation throw them away here.
+                async with open_cancel_scope(shield=True):
+                    return await run_sync_in_worker_thread(_deserialize_all, deserialize, records)
+            elif records:
+                return _deserialize_all(deserialize, records)
 
             async with move_on_after(self.max_poll_time):
                 await self._jobs_event.wait()
                 self._jobs_event.clear()
 
     async def release_jobs(self, worker_id: str, jobs: List[Job]) -> None:
-        job_ids = {j.id for j in jobs}
-        await self.pool.execute(
-            f"DELETE FROM {self.schema}.jobs WHERE acquired_by = $1 AND id = any($2::uuid[])",
-            worker_id, job_ids)
+        job_ids = tuple(job.id for job in jobs)
+        await self.pool.execute(self._sql_release_jobs, worker_id, job_ids)
@@ -114,14 +114,19 @@ class EventHub(EventSource):
                 existing_callbacks.remove(callback)
 
     async def publish(self, event: Event) -> None:
-        for callback in self._subscribers[type(event)]:
-            try:
-                retval = callback(event)
-                if isawaitable(retval):
-                    await retval
-            except Exception as exc:
-                warn(f'Failed to deliver {event.__class__.__name__} event to callback '
-                     f'{callback!r}: {exc.__class__.__name__}: {exc}')
+        await self.publish_many((event,))
+
+    async def publish_many(self, events: Iterable[Event]) -> None:
+        subscribers = self._subscribers
+        for event in events:
+            for callback in subscribers[type(event)]:
+                try:
+                    retval = callback(event)
+                    if isawaitable(retval):
+                        await retval
+                except Exception as exc:
+                    warn(f'Failed to deliver {event.__class__.__name__} event to callback '
+                         f'{callback!r}: {exc.__class__.__name__}: {exc}')
 
 
 class SyncEventSource:
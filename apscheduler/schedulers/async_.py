@@ -4,7 +4,7 @@ import threading
 from contextlib import AsyncExitStack
 from datetime import datetime, timedelta, timezone
 from logging import Logger, getLogger
-from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Union
 from uuid import uuid4
 
 from anyio import create_event, create_task_group, get_cancelled_exc_class, open_cancel_scope
@@ -131,6 +131,7 @@ class AsyncScheduler(EventHub):
                     del self._acquire_cancel_scope
 
             now = datetime.now(timezone.utc)
+            jobs: List[Job] = []
             for schedule in schedules:
                 # Look up the task definition
                 try:
@@ -164,14 +165,16 @@ class AsyncScheduler(EventHub):
                     elif schedule.coalesce is CoalescePolicy.latest:
                         fire_times[0] = fire_time
 
-                # Add one or more jobs to the job queue
+                # Create one or more jobs for the job queue
                 for fire_time in fire_times:
                     schedule.last_fire_time = fire_time
                     job = Job(taskdef.id, taskdef.func, schedule.args, schedule.kwargs,
                               schedule.id, fire_time, schedule.next_deadline,
                               schedule.tags)
-                    print('Added job', job.id, 'for schedule', schedule)
-                    await self.data_store.add_job(job)
+                    jobs.append(job)
+
+            # Add all the created jobs to the job queue in one go
+            await self.data_store.add_jobs(jobs)
 
             self.logger.debug('Releasing %d schedules', len(schedules))
             await self.data_store.release_schedules(self.identity, schedules)
@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field
+from datetime import tzinfo
+from typing import Any, Dict
+from uuid import UUID
+
+from msgpack import ExtType, packb, unpackb
+
+from ..abc import Serializer
+from ..marshalling import marshal_object, marshal_timezone, unmarshal_object, unmarshal_timezone
+
+
+@dataclass
+class MsgpackSerializer(Serializer):
+    type_code: int = 119
+    uuid_type_code: int = 120
+    timezone_type_code: int = 121
+    dump_options: Dict[str, Any] = field(default_factory=dict)
+    load_options: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.dump_options.setdefault('default', self._default_hook)
+        self.dump_options.setdefault('use_bin_type', True)
+        self.dump_options.setdefault('datetime', True)
+        self.load_options.setdefault('ext_hook', self._ext_hook)
+        self.load_options.setdefault('raw', False)
+        self.load_options.setdefault('timestamp', 3)
+
+    def _default_hook(self, obj):
+        if isinstance(obj, UUID):
+            return ExtType(self.uuid_type_code, obj.bytes)
+        elif isinstance(obj, tzinfo):
+            return ExtType(self.timezone_type_code, marshal_timezone(obj).encode('utf-8'))
+        elif hasattr(obj, '__getstate__') and hasattr(obj, '__setstate__'):
+            marshalled = marshal_object(obj)
+            return ExtType(self.type_code, packb(marshalled, **self.dump_options))
+
+        raise TypeError(f'Object of type {obj.__class__.__name__!r} is not msgpack serializable')
+
+    def _ext_hook(self, code: int, data: bytes):
+        if code == self.type_code:
+            cls_ref, state = unpackb(data, **self.load_options)
+            return unmarshal_object(cls_ref, state)
+        elif code == self.uuid_type_code:
+            return UUID(bytes=data)
+        elif code == self.timezone_type_code:
+            return unmarshal_timezone(data.decode('utf-8'))
+
+        return ExtType(code, data)
+
+    def serialize(self, obj) -> bytes:
+        return packb(obj, **self.dump_options)
+
+    def deserialize(self, serialized: bytes):
+        return unpackb(serialized, **self.load_options)
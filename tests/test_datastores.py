@@ -92,6 +92,33 @@ async def test_replace_schedules(store, schedules, events):
     assert events[0].next_fire_time == datetime(2020, 9, 15, tzinfo=timezone.utc)
 
 
+async def test_replace_nonexistent_schedule(store, schedules, events):
+    await store.add_schedule(schedules[0], ConflictPolicy.replace)
+
+    assert await store.get_schedules() == [schedules[0]]
+    assert len(events) == 1
+    assert isinstance(events[0], ScheduleAdded)
+    assert events[0].schedule_id == 's1'
+    assert events[0].next_fire_time == schedules[0].next_fire_time
+
+
+async def test_add_schedule_do_nothing(store, schedules, events):
+    for schedule in schedules:
+        await store.add_schedule(schedule, ConflictPolicy.exception)
+
+    events.clear()
+    schedule = Schedule(id='s3', task_id='foo', trigger=schedules[2].trigger, args=(),
+                        kwargs={}, coalesce=CoalescePolicy.earliest, misfire_grace_time=None,
+                        tags=frozenset())
+    schedule.next_fire_time = schedules[2].trigger.next()
+    await store.add_schedule(schedule, ConflictPolicy.do_nothing)
+
+    schedules = await store.get_schedules({schedule.id})
+    assert schedules[0].task_id == 'bogus'
+    assert schedules[0].coalesce is CoalescePolicy.latest
+    assert not events
+
+
 async def test_remove_schedules(store, schedules, events):
     for schedule in schedules:
         await store.add_schedule(schedule, ConflictPolicy.exception)
@@ -177,6 +204,25 @@ async def test_acquire_schedules_lock_timeout(store, schedules, events, freezer)
     assert acquired[0].id == 's1'
 
 
+async def test_add_jobs(store, jobs):
+    await store.add_jobs(jobs)
+
+    visible_jobs = await store.get_jobs()
+    assert {job.id for job in visible_jobs} == {job.id for job in jobs}
+
+    acquired = await store.acquire_jobs('dummy-id1', 2)
+    assert {job.id for job in acquired} == {job.id for job in jobs}
+
+
+async def test_acquire_many_jobs(store):
+    jobs = [Job('task1', print, (i,), {}, None, None, None, frozenset()) for i in range(40)]
+    await store.add_jobs(jobs)
+
+    acquired = await store.acquire_jobs('dummy-id1')
+    assert {job.id for job in acquired} == {job.id for job in jobs}
+    assert {job.args for job in acquired} == {(i,) for i in range(40)}
+
+
 async def test_acquire_release_jobs(store, jobs, events):
     for job in jobs:
         await store.add_job(job)
@@ -0,0 +1,32 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from apscheduler.exceptions import SerializationError
+from apscheduler.serializers.msgpack import MsgpackSerializer
+
+if sys.version_info >= (3, 9):
+    from zoneinfo import ZoneInfo
+else:
+    from backports.zoneinfo import ZoneInfo
+
+
+class TestMsgpackSerializer:
+    @pytest.mark.parametrize('value', [
+        pytest.param(datetime(2020, 9, 13, 16, 5, 17, 123456, timezone.utc), id='datetime'),
+        pytest.param(uuid4(), id='uuid'),
+        pytest.param(ZoneInfo('Europe/Berlin'), id='timezone'),
+        pytest.param([datetime(2020, 9, 13, tzinfo=timezone.utc), uuid4()], id='nested')
+    ])
+    def test_round_trip(self, value):
+        serializer = MsgpackSerializer()
+        assert serializer.deserialize(serializer.serialize(value)) == value
+
+    def test_unmarshallable_object(self):
+        serializer = MsgpackSerializer()
+        pytest.raises(TypeError, serializer.serialize, timedelta(seconds=5))
+
+    def test_unserializable_timezone(self):
+        serializer = MsgpackSerializer()
+        pytest.raises(SerializationError, serializer.serialize, timezone(timedelta(hours=2)))